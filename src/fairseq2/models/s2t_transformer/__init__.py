@@ -19,6 +19,9 @@ from fairseq2.models.s2t_transformer.builder import (
 from fairseq2.models.s2t_transformer.builder import (
     s2t_transformer_archs as s2t_transformer_archs,
 )
+from fairseq2.models.s2t_transformer.export import (
+    export_s2t_transformer_frontend_to_onnx as export_s2t_transformer_frontend_to_onnx,
+)
 from fairseq2.models.s2t_transformer.feature_extractor import (
     Conv1dFbankSubsampler as Conv1dFbankSubsampler,
 )
@@ -0,0 +1,88 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+from pathlib import Path
+from typing import Tuple
+
+import torch
+from torch import Tensor
+from torch.nn import Module
+
+from fairseq2.models.s2t_transformer.frontend import S2TTransformerFrontend
+from fairseq2.nn.padding import PaddingMask
+
+
+def export_s2t_transformer_frontend_to_onnx(
+    frontend: S2TTransformerFrontend,
+    pathname: Path,
+    seqs: Tensor,
+    seq_lens: Tensor,
+    *,
+    opset_version: int = 17,
+) -> None:
+    """Export ``frontend`` to ONNX for inference deployment.
+
+    The exported graph takes ``seqs`` and ``seq_lens`` tensors, and returns the
+    extracted features along with their sequence lengths. The batch and sequence
+    dimensions are exported as dynamic axes. Dropout is excluded by tracing the
+    front-end in eval mode.
+
+    :param frontend:
+        The front-end to export.
+    :param pathname:
+        The pathname of the ONNX file to write.
+    :param seqs:
+        The example sequences to trace with. *Shape:* :math:`(N,S,*)`, where
+        :math:`N` is the batch size, :math:`S` is the sequence length, and
+        :math:`*` is any number of sequence-specific dimensions including none.
+    :param seq_lens:
+        The example sequence lengths. *Shape:* :math:`(N)`, where :math:`N` is
+        the batch size.
+    :param opset_version:
+        The ONNX opset version to target.
+    """
+    was_training = frontend.training
+
+    frontend.eval()
+
+    try:
+        torch.onnx.export(
+            _FrontendExportWrapper(frontend),
+            (seqs, seq_lens),
+            str(pathname),
+            input_names=["seqs", "seq_lens"],
+            output_names=["features", "feature_seq_lens"],
+            dynamic_axes={
+                "seqs": {0: "batch_size", 1: "seq_len"},
+                "seq_lens": {0: "batch_size"},
+                "features": {0: "batch_size", 1: "feature_seq_len"},
+                "feature_seq_lens": {0: "batch_size"},
+            },
+            opset_version=opset_version,
+        )
+    finally:
+        frontend.train(was_training)
+
+
+class _FrontendExportWrapper(Module):
+    """Exposes an :class:`S2TTransformerFrontend` with tensor-only inputs and
+    outputs as required by ONNX."""
+
+    frontend: S2TTransformerFrontend
+
+    def __init__(self, frontend: S2TTransformerFrontend) -> None:
+        super().__init__()
+
+        self.frontend = frontend
+
+    def forward(self, seqs: Tensor, seq_lens: Tensor) -> Tuple[Tensor, Tensor]:
+        padding_mask = PaddingMask(seq_lens, batch_seq_len=seqs.size(1))
+
+        features, padding_mask = self.frontend(seqs, padding_mask)
+
+        assert padding_mask is not None
+
+        return features, padding_mask.seq_lens
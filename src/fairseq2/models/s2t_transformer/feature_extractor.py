@@ -115,8 +115,10 @@ class Conv1dFbankSubsampler(SequenceFeatureExtractor):
         return features, padding_mask
 
     def _contract_seq_lens(self, num_frames: Tensor) -> Tensor:
-        seq_lens = num_frames.clone()
+        seq_lens = num_frames
 
+        # The operations below are out-of-place, so `num_frames` is not
+        # modified.
         for _ in range(len(self.layers)):
             seq_lens = (((seq_lens - 1) / self.stride) + 1.0).floor()
 
@@ -36,6 +36,7 @@ class S2TTransformerFrontend(TransformerFrontend):
         feature_extractor: Optional[SequenceFeatureExtractor],
         pos_encoder: Optional[PositionEncoder],
         *,
+        no_scale: bool = False,
         proj: bool = False,
         dropout_p: float = 0.1,
         device: Optional[Device] = None,
@@ -49,6 +50,9 @@ class S2TTransformerFrontend(TransformerFrontend):
             extracted externally before being fed to the model.
         :param pos_encoder:
             The position encoder.
+        :param no_scale:
+            If ``True``, does not scale extracted features by the square root of
+            the model dimensionality.
         :param proj:
             If ``True``, applies projection to extracted features before dropout
             as described in Section 2 of
@@ -68,7 +72,7 @@ class S2TTransformerFrontend(TransformerFrontend):
         else:
             self.register_module("feature_extractor", None)
 
-        self.scale = math.sqrt(model_dim)
+        self.scale = 1.0 if no_scale else math.sqrt(model_dim)
 
         if pos_encoder is not None:
             if pos_encoder.encoding_dim != model_dim:
@@ -110,7 +114,8 @@ class S2TTransformerFrontend(TransformerFrontend):
         else:
             features = seqs
 
-        features = features * self.scale
+        if self.scale != 1.0:
+            features = features * self.scale
 
         if self.pos_encoder is not None:
             features = self.pos_encoder(features, padding_mask)
@@ -122,3 +127,12 @@ class S2TTransformerFrontend(TransformerFrontend):
             features = self.dropout(features)
 
         return features, padding_mask
+
+    def extra_repr(self) -> str:
+        """:meta private:"""
+        s = super().extra_repr()
+
+        if self.scale != 1.0:
+            s = f"{s}, no_scale=False"
+
+        return s
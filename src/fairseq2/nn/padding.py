@@ -10,6 +10,7 @@ import torch
 from torch import Tensor
 
 from fairseq2.data import Collater, SequenceData
+from fairseq2.typing import DataType
 
 
 class PaddingMask:
@@ -22,6 +23,8 @@ class PaddingMask:
     """The boolean padding mask tensor. Will be ``None`` till the first call to
     :method:`materialize`."""
 
+    _materialized_float: Optional[Tensor]
+
     def __init__(self, seq_lens: Tensor, batch_seq_len: int) -> None:
         """
         :param seq_lens:
@@ -35,6 +38,8 @@ class PaddingMask:
 
         self.materialized = None
 
+        self._materialized_float = None
+
     def materialize(self) -> Tensor:
         """Materialize the boolean padding mask tensor."""
         if self.materialized is None:
@@ -42,6 +47,29 @@ class PaddingMask:
 
         return self.materialized
 
+    def materialize_as_float(self, dtype: DataType) -> Tensor:
+        """Materialize the padding mask as a float tensor that can be added to
+        attention weights; padded positions are ``-inf`` and the rest are zero.
+
+        Like :meth:`materialize`, the tensor is computed once and shared by all
+        attention layers that receive this mask.
+
+        :param dtype:
+            The data type of the mask tensor.
+        """
+        m = self._materialized_float
+
+        if m is None or m.dtype != dtype:
+            bool_mask = self.materialize()
+
+            m = torch.zeros(bool_mask.shape, device=bool_mask.device, dtype=dtype)
+
+            m.masked_fill_(~bool_mask, -torch.inf)
+
+            self._materialized_float = m
+
+        return m
+
     def trim(self, size: int) -> "PaddingMask":
         """Return a new trimmed padding mask.
 
@@ -12,7 +12,6 @@ import torch
 import torch.nn as nn
 from torch import Tensor
 from torch.nn import Module
-from torch.nn.functional import embedding
 from torch.nn.parameter import Parameter
 
 from fairseq2.nn.incremental_state import IncrementalStateBag
@@ -211,13 +210,11 @@ class SinusoidalPositionEncoder(PositionEncoder):
         # This is identical to tensor2tensor's implementation.
         freqs = torch.exp(indices * -math.log(10000.0) / (num_sin - 1))
 
-        # (S) x (E) -> (S, E)
-        torch.outer(steps, freqs, out=l_half)
-
-        r_half.copy_(l_half)
+        # (S) x (E / 2) -> (S, E / 2)
+        phases = torch.outer(steps, freqs)
 
-        l_half.sin_()
-        r_half.cos_()
+        torch.sin(phases, out=l_half)
+        torch.cos(phases, out=r_half)
 
     @finaloverride
     def _do_forward(
@@ -296,11 +293,9 @@ class LearnedPositionEncoder(PositionEncoder):
         else:
             start_step = state_bag.step
 
-        steps = torch.arange(
-            start_step, start_step + seq_len, device=seqs.device, dtype=torch.int64
-        )
-
-        return seqs + embedding(steps, self.weight)
+        # The steps are contiguous, so a plain slice is enough; no need to
+        # allocate indices and launch a gather kernel.
+        return seqs + self.weight[start_step : start_step + seq_len]
 
 
 @final
@@ -381,9 +376,19 @@ class RotaryEncoder(PositionEncoder):
         # (*, S, E) -> (*, S, E / 2, 2)
         seqs = seqs.unflatten(-1, (-1, 2))
 
-        complex_seqs = torch.view_as_complex(seqs.float())
+        fp32_seqs = seqs.float()
+
+        complex_seqs = torch.view_as_complex(fp32_seqs)
 
-        complex_seqs = complex_seqs * self.freqs[start_step : start_step + seq_len]
+        freqs = self.freqs[start_step : start_step + seq_len]
+
+        # The rotation is a single complex multiplication. For half-precision
+        # inputs, `fp32_seqs` is a copy that we own, so we can rotate it in-place
+        # and save an allocation.
+        if fp32_seqs is seqs:
+            complex_seqs = complex_seqs * freqs
+        else:
+            complex_seqs.mul_(freqs)
 
         # (*, S, E / 2, 2) -> (*, S, E)
         fp32_seqs = torch.view_as_real(complex_seqs).flatten(-2)
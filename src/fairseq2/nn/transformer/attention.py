@@ -17,9 +17,16 @@ from torch.nn.functional import dropout, softmax
 
 from fairseq2.nn.padding import PaddingMask
 from fairseq2.nn.transformer.attention_mask import AttentionMask, CausalAttentionMask
-from fairseq2.typing import finaloverride
+from fairseq2.typing import DataType, finaloverride
 from fairseq2.utils.version import is_pt2_or_greater
 
+try:
+    from flash_attn import flash_attn_func  # type: ignore[import]
+except ImportError:
+    _has_flash_attn = False
+else:
+    _has_flash_attn = True
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,14 +83,32 @@ class SDPA(Module, ABC):
 
 @final
 class TorchSDPA(SDPA):
-    """Computes scaled dot-product attention using PyTorch SDPA v2."""
+    """Computes scaled dot-product attention using PyTorch SDPA v2.
+
+    If ``seqs``, ``keys``, and ``values`` are nested tensors on a CUDA device,
+    attention is computed in a padding-free manner over the actual sequence
+    lengths. Note that this path is only taken when :class:`TorchSDPA` is
+    called directly with nested tensors; :class:`MultiheadAttention` and the
+    model front-ends work with dense tensors and a :class:`PaddingMask`, and
+    never produce nested inputs.
+    """
 
     attn_dropout_p: float
+    compute_dtype: Optional[DataType]
 
-    def __init__(self, *, attn_dropout_p: float = 0.0) -> None:
+    def __init__(
+        self,
+        *,
+        attn_dropout_p: float = 0.0,
+        compute_dtype: Optional[DataType] = None,
+    ) -> None:
         """
         :param attn_dropout_p:
             The dropout probability on attention weights.
+        :param compute_dtype:
+            The data type in which to compute attention (e.g. ``torch.bfloat16``
+            to use Tensor Cores on single precision models). If ``None``, uses
+            the data type of the inputs.
         """
         super().__init__()
 
@@ -93,6 +118,7 @@ class TorchSDPA(SDPA):
         self._has_warned = False
 
         self.attn_dropout_p = attn_dropout_p
+        self.compute_dtype = compute_dtype
 
     @finaloverride
     def forward(
@@ -105,6 +131,34 @@ class TorchSDPA(SDPA):
         attn_mask: Optional[AttentionMask] = None,
         needs_weights: bool = False,
     ) -> Tuple[Tensor, Optional[Tensor]]:
+        dtype = seqs.dtype
+
+        if self.compute_dtype is not None:
+            seqs, keys, values = _cast_qkv(seqs, keys, values, self.compute_dtype)
+
+        attn, attn_weights = self._do_forward(
+            seqs, keys, key_padding_mask, values, attn_mask, needs_weights
+        )
+
+        if self.compute_dtype is not None:
+            attn, attn_weights = _cast_attn(attn, attn_weights, dtype)
+
+        return attn, attn_weights
+
+    def _do_forward(
+        self,
+        seqs: Tensor,
+        keys: Tensor,
+        key_padding_mask: Optional[PaddingMask],
+        values: Tensor,
+        attn_mask: Optional[AttentionMask],
+        needs_weights: bool,
+    ) -> Tuple[Tensor, Optional[Tensor]]:
+        if seqs.is_nested:
+            return self._forward_nested(
+                seqs, keys, key_padding_mask, values, attn_mask, needs_weights
+            )
+
         if not seqs.is_cuda:
             return _naive_scaled_dot_product_attention(
                 seqs,
@@ -143,36 +197,47 @@ class TorchSDPA(SDPA):
 
         is_causal = False
 
-        if key_padding_mask is not None:
-            mask = key_padding_mask.materialize()
+        if _is_full_causal(attn_mask) and seqs.size(2) == keys.size(2):
+            # With right-padded sequences, a query never attends to a padded key
+            # under a square causal mask unless it is itself a padded position.
+            # So the key padding mask can be dropped, which lets PyTorch pick a
+            # fused kernel. Only the (ignored) outputs of padded positions can
+            # differ from the naive implementation.
+            mask = None
+
+            is_causal = True
+        elif key_padding_mask is not None:
+            # The additive form is cached in the padding mask, so it is built
+            # once and shared by all attention layers.
+            mask = key_padding_mask.materialize_as_float(seqs.dtype)
 
             # (N, S_kv) -> (N, 1, 1, S_kv)
             mask = mask[:, None, None, :]
 
-            # (N, 1, 1, S_kv) -> (N, H, S, S_kv)
-            mask = mask.expand(-1, seqs.size(1), seqs.size(2), -1)
-
             if attn_mask is not None:
                 # ([H], S, S_kv)
                 m = attn_mask.materialize()
 
-                # (N, H, S, S_kv)
-                mask = torch.where(mask, m, -torch.inf)
-        elif isinstance(attn_mask, CausalAttentionMask):
+                # ([H], S, S_kv) + (N, 1, 1, S_kv) -> (N, [H], S, S_kv)
+                mask = m + mask
+
+            # (N, [H], S, S_kv) -> (N, H, S, S_kv)
+            mask = mask.expand(-1, seqs.size(1), seqs.size(2), -1)
+        elif _is_full_causal(attn_mask):
             # PyTorch SDPA supports only full causal attention.
-            if attn_mask.attn_window_len is None:
-                mask = None
+            mask = None
 
-                is_causal = True
-            else:
-                # ([H], S, S_kv)
-                mask = attn_mask.materialize()
+            is_causal = True
         elif attn_mask is not None:
             # ([H], S, S_kv)
             mask = attn_mask.materialize()
         else:
             mask = None
 
+        # Float masks must match the data type of the queries.
+        if mask is not None and mask.dtype != torch.bool:
+            mask = mask.to(seqs.dtype)
+
         attn = F.scaled_dot_product_attention(  # type: ignore[attr-defined]
             seqs,
             keys,
@@ -184,9 +249,224 @@ class TorchSDPA(SDPA):
 
         return attn, None
 
+    def _forward_nested(
+        self,
+        seqs: Tensor,
+        keys: Tensor,
+        key_padding_mask: Optional[PaddingMask],
+        values: Tensor,
+        attn_mask: Optional[AttentionMask],
+        needs_weights: bool,
+    ) -> Tuple[Tensor, Optional[Tensor]]:
+        # Nested tensors carry the length of each sequence, so padded positions
+        # never take part in attention and no mask has to be built.
+        if key_padding_mask is not None:
+            raise ValueError(
+                "`key_padding_mask` must be `None` when `seqs` is a nested tensor."
+            )
+
+        if needs_weights:
+            raise ValueError(
+                "`needs_weights` must be `False` when `seqs` is a nested tensor."
+            )
+
+        is_causal = False
+
+        if attn_mask is not None:
+            if not _is_full_causal(attn_mask):
+                raise ValueError(
+                    f"`attn_mask` must be `None` or a full `CausalAttentionMask` when `seqs` is a nested tensor, but is `{type(attn_mask).__name__}` instead."
+                )
+
+            is_causal = True
+
+        # As of PyTorch 2.0, SDPA supports nested tensors only on CUDA.
+        if not seqs.is_cuda:
+            raise ValueError(
+                "`seqs` must be on a CUDA device when it is a nested tensor."
+            )
+
+        if not self.training:
+            dropout_p = 0.0
+        else:
+            dropout_p = self.attn_dropout_p
+
+        attn = F.scaled_dot_product_attention(  # type: ignore[attr-defined]
+            seqs, keys, values, dropout_p=dropout_p, is_causal=is_causal
+        )
+
+        return attn, None
+
     def extra_repr(self) -> str:
         """:meta private:"""
-        return f"attn_dropout_p={self.attn_dropout_p}"
+        s = f"attn_dropout_p={self.attn_dropout_p}"
+
+        if self.compute_dtype is not None:
+            s = f"{s}, compute_dtype={self.compute_dtype}"
+
+        return s
+
+
+@final
+class FlashSDPA(SDPA):
+    """Computes scaled dot-product attention using FlashAttention-2 as
+    described in :cite:t:`https://doi.org/10.48550/arxiv.2307.08691`.
+
+    Falls back to :class:`TorchSDPA` for inputs that FlashAttention-2 does not
+    support; namely non-CUDA or single precision tensors (unless
+    ``compute_dtype`` is half precision), GPUs older than Ampere (SM80), head
+    sizes greater than 256, key padding masks without a square causal mask,
+    attention masks other than a full causal mask, and ``needs_weights``.
+    """
+
+    attn_dropout_p: float
+    compute_dtype: Optional[DataType]
+    fallback_sdpa: TorchSDPA
+
+    def __init__(
+        self,
+        *,
+        attn_dropout_p: float = 0.0,
+        compute_dtype: Optional[DataType] = None,
+    ) -> None:
+        """
+        :param attn_dropout_p:
+            The dropout probability on attention weights.
+        :param compute_dtype:
+            The data type in which to compute attention (e.g. ``torch.bfloat16``
+            to use FlashAttention-2 on single precision models). If ``None``,
+            uses the data type of the inputs.
+        """
+        super().__init__()
+
+        if not _has_flash_attn:
+            raise ValueError("`FlashSDPA` requires the `flash-attn` package.")
+
+        if not is_pt2_or_greater():
+            raise ValueError("`FlashSDPA` requires PyTorch 2.0.0 or greater.")
+
+        self.attn_dropout_p = attn_dropout_p
+        self.compute_dtype = compute_dtype
+
+        self.fallback_sdpa = TorchSDPA(
+            attn_dropout_p=attn_dropout_p, compute_dtype=compute_dtype
+        )
+
+    @finaloverride
+    def forward(
+        self,
+        seqs: Tensor,
+        keys: Tensor,
+        key_padding_mask: Optional[PaddingMask],
+        values: Tensor,
+        *,
+        attn_mask: Optional[AttentionMask] = None,
+        needs_weights: bool = False,
+    ) -> Tuple[Tensor, Optional[Tensor]]:
+        dtype = seqs.dtype
+
+        # Cast before checking for support, so that single precision inputs can
+        # use FlashAttention-2 with a half precision `compute_dtype`. Since the
+        # inputs are already cast, the cast in `fallback_sdpa` is a no-op.
+        if self.compute_dtype is not None:
+            seqs, keys, values = _cast_qkv(seqs, keys, values, self.compute_dtype)
+
+        attn, attn_weights = self._do_forward(
+            seqs, keys, key_padding_mask, values, attn_mask, needs_weights
+        )
+
+        if self.compute_dtype is not None:
+            attn, attn_weights = _cast_attn(attn, attn_weights, dtype)
+
+        return attn, attn_weights
+
+    def _do_forward(
+        self,
+        seqs: Tensor,
+        keys: Tensor,
+        key_padding_mask: Optional[PaddingMask],
+        values: Tensor,
+        attn_mask: Optional[AttentionMask],
+        needs_weights: bool,
+    ) -> Tuple[Tensor, Optional[Tensor]]:
+        if not self._supports(
+            seqs, keys, key_padding_mask, values, attn_mask, needs_weights
+        ):
+            return self.fallback_sdpa(  # type: ignore[no-any-return]
+                seqs,
+                keys,
+                key_padding_mask,
+                values,
+                attn_mask=attn_mask,
+                needs_weights=needs_weights,
+            )
+
+        if not self.training:
+            dropout_p = 0.0
+        else:
+            dropout_p = self.attn_dropout_p
+
+        # (N, H, S, K) -> (N, S, H, K)
+        seqs = seqs.transpose(1, 2)
+
+        # (N, H, S_kv, K) -> (N, S_kv, H, K)
+        keys = keys.transpose(1, 2)
+
+        # (N, H, S_kv, V) -> (N, S_kv, H, V)
+        values = values.transpose(1, 2)
+
+        attn = flash_attn_func(
+            seqs, keys, values, dropout_p, causal=attn_mask is not None
+        )
+
+        # (N, S, H, V) -> (N, H, S, V)
+        attn = attn.transpose(1, 2)
+
+        return attn, None
+
+    @staticmethod
+    def _supports(
+        seqs: Tensor,
+        keys: Tensor,
+        key_padding_mask: Optional[PaddingMask],
+        values: Tensor,
+        attn_mask: Optional[AttentionMask],
+        needs_weights: bool,
+    ) -> bool:
+        if seqs.is_nested or not seqs.is_cuda:
+            return False
+
+        if seqs.dtype not in (torch.float16, torch.bfloat16):
+            return False
+
+        # FlashAttention-2 requires Ampere or newer.
+        if torch.cuda.get_device_capability(seqs.device) < (8, 0):
+            return False
+
+        # FlashAttention-2 expects keys and values to share the same head size,
+        # and supports head sizes up to 256.
+        if keys.size(-1) != values.size(-1) or keys.size(-1) > 256:
+            return False
+
+        if needs_weights:
+            return False
+
+        if attn_mask is None:
+            return key_padding_mask is None
+
+        # FlashAttention-2 aligns causal masks to the bottom-right corner of the
+        # attention matrix, so it matches ours only when it is square. In that
+        # case the key padding mask can be dropped as well; see `TorchSDPA`.
+        return _is_full_causal(attn_mask) and seqs.size(2) == keys.size(2)
+
+    def extra_repr(self) -> str:
+        """:meta private:"""
+        s = f"attn_dropout_p={self.attn_dropout_p}"
+
+        if self.compute_dtype is not None:
+            s = f"{s}, compute_dtype={self.compute_dtype}"
+
+        return s
 
 
 @final
@@ -194,15 +474,26 @@ class NaiveSDPA(SDPA):
     """Computes scaled dot-product attention using a Python implementation."""
 
     attn_dropout_p: float
+    compute_dtype: Optional[DataType]
 
-    def __init__(self, *, attn_dropout_p: float = 0.0) -> None:
+    def __init__(
+        self,
+        *,
+        attn_dropout_p: float = 0.0,
+        compute_dtype: Optional[DataType] = None,
+    ) -> None:
         """
         :param attn_dropout_p:
             The dropout probability on attention weights.
+        :param compute_dtype:
+            The data type in which to compute attention (e.g. ``torch.bfloat16``
+            to use Tensor Cores on single precision models). If ``None``, uses
+            the data type of the inputs.
         """
         super().__init__()
 
         self.attn_dropout_p = attn_dropout_p
+        self.compute_dtype = compute_dtype
 
     @finaloverride
     def forward(
@@ -215,7 +506,12 @@ class NaiveSDPA(SDPA):
         attn_mask: Optional[AttentionMask] = None,
         needs_weights: bool = False,
     ) -> Tuple[Tensor, Optional[Tensor]]:
-        return _naive_scaled_dot_product_attention(
+        dtype = seqs.dtype
+
+        if self.compute_dtype is not None:
+            seqs, keys, values = _cast_qkv(seqs, keys, values, self.compute_dtype)
+
+        attn, attn_weights = _naive_scaled_dot_product_attention(
             seqs,
             keys,
             key_padding_mask,
@@ -226,9 +522,19 @@ class NaiveSDPA(SDPA):
             self.training,
         )
 
+        if self.compute_dtype is not None:
+            attn, attn_weights = _cast_attn(attn, attn_weights, dtype)
+
+        return attn, attn_weights
+
     def extra_repr(self) -> str:
         """:meta private:"""
-        return f"attn_dropout_p={self.attn_dropout_p}"
+        s = f"attn_dropout_p={self.attn_dropout_p}"
+
+        if self.compute_dtype is not None:
+            s = f"{s}, compute_dtype={self.compute_dtype}"
+
+        return s
 
 
 def _naive_scaled_dot_product_attention(
@@ -241,19 +547,56 @@ def _naive_scaled_dot_product_attention(
     needs_weights: bool,
     training: bool,
 ) -> Tuple[Tensor, Optional[Tensor]]:
-    # (N, H, S, K) @ (N, H, K, S_kv) = (N, H, S, S_kv)
-    attn_weights = torch.matmul(seqs, keys.transpose(-1, -2))
+    batch_size, num_heads = seqs.size(0), seqs.size(1)
+
+    # (N, H, S, K) -> (N x H, S, K)
+    q = seqs.flatten(0, 1)
 
-    attn_weights = attn_weights * (seqs.size(-1) ** -0.5)
+    # (N, H, S_kv, K) -> (N x H, K, S_kv)
+    k = keys.flatten(0, 1).transpose(1, 2)
+
+    m: Optional[Tensor] = None
 
     if attn_mask is not None:
-        # (S, S_kv)
+        # ([[N], H], S, S_kv)
         m = attn_mask.materialize()
 
-        # (N, H, S, S_kv) + (S, S_kv) -> (N, H, S, S_kv)
+    # A 2-dimensional mask broadcasts over the (N x H) batch of the matmul, so
+    # it can be folded in if it has the same data type as the queries. Other
+    # masks are added afterwards, which avoids copying them for each head and
+    # keeps the type promotion of a plain addition.
+    if m is not None and m.ndim == 2 and m.dtype == seqs.dtype:
+        # (S, S_kv)
+        bias, m = m, None
+
+        beta = 1.0
+    elif attn_mask is None and key_padding_mask is not None:
+        # (N, S_kv)
+        bias = key_padding_mask.materialize_as_float(seqs.dtype)
+
+        # (N, S_kv) -> (N x H, 1, S_kv)
+        bias = bias[:, None, None, :].expand(-1, num_heads, -1, -1).flatten(0, 1)
+
+        beta = 1.0
+    else:
+        # Ignored by `baddbmm` since `beta` is zero.
+        bias = q.new_zeros(())
+
+        beta = 0.0
+
+    # Fold the scaling and, if possible, the mask addition into the matmul.
+    # (N x H, S, K) @ (N x H, K, S_kv) = (N x H, S, S_kv)
+    attn_weights = torch.baddbmm(bias, q, k, beta=beta, alpha=seqs.size(-1) ** -0.5)
+
+    # (N x H, S, S_kv) -> (N, H, S, S_kv)
+    attn_weights = attn_weights.unflatten(0, (batch_size, num_heads))
+
+    if m is not None:
+        # (N, H, S, S_kv) + ([[N], H], S, S_kv) -> (N, H, S, S_kv)
         attn_weights = attn_weights + m
 
-    if key_padding_mask is not None:
+    # If there is no attention mask, the padding mask is already applied above.
+    if key_padding_mask is not None and attn_mask is not None:
         # (N, S_kv)
         m = key_padding_mask.materialize()
 
@@ -276,6 +619,28 @@ def _naive_scaled_dot_product_attention(
     return attn, attn_weights if needs_weights else None
 
 
+def _is_full_causal(attn_mask: Optional[AttentionMask]) -> bool:
+    if not isinstance(attn_mask, CausalAttentionMask):
+        return False
+
+    return attn_mask.attn_window_len is None
+
+
+def _cast_qkv(
+    seqs: Tensor, keys: Tensor, values: Tensor, dtype: DataType
+) -> Tuple[Tensor, Tensor, Tensor]:
+    return seqs.to(dtype), keys.to(dtype), values.to(dtype)
+
+
+def _cast_attn(
+    attn: Tensor, attn_weights: Optional[Tensor], dtype: DataType
+) -> Tuple[Tensor, Optional[Tensor]]:
+    if attn_weights is not None:
+        attn_weights = attn_weights.to(dtype)
+
+    return attn.to(dtype), attn_weights
+
+
 class SDPAFactory(Protocol):
     """Constructs instances of :class:`SDPA`."""
 
@@ -287,11 +652,15 @@ class SDPAFactory(Protocol):
 
 
 def _get_fallback_sdpa_factory() -> SDPAFactory:
-    if is_pt2_or_greater():
-        return TorchSDPA
-    else:
+    if not is_pt2_or_greater():
         return NaiveSDPA
 
+    # `FlashSDPA` falls back to `TorchSDPA`, so it requires PyTorch 2.0 as well.
+    if _has_flash_attn:
+        return FlashSDPA
+    else:
+        return TorchSDPA
+
 
 _sdpa_factory: SDPAFactory = _get_fallback_sdpa_factory()
 
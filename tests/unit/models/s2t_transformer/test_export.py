@@ -0,0 +1,73 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+from pathlib import Path
+
+import pytest
+import torch
+
+from fairseq2.models.s2t_transformer import (
+    Conv1dFbankSubsampler,
+    S2TTransformerFrontend,
+    export_s2t_transformer_frontend_to_onnx,
+)
+from fairseq2.nn.padding import PaddingMask
+from fairseq2.nn.position_encoder import SinusoidalPositionEncoder
+from tests.common import assert_close, assert_equal
+
+
+def test_export_s2t_transformer_frontend_to_onnx_works(tmp_path: Path) -> None:
+    onnx = pytest.importorskip("onnx")
+
+    onnxruntime = pytest.importorskip("onnxruntime")
+
+    feature_extractor = Conv1dFbankSubsampler(
+        num_channels=8, inner_dim=16, feature_dim=32
+    )
+
+    pos_encoder = SinusoidalPositionEncoder(encoding_dim=32, max_seq_len=64)
+
+    frontend = S2TTransformerFrontend(32, feature_extractor, pos_encoder)
+
+    pathname = tmp_path.joinpath("frontend.onnx")
+
+    seqs = torch.randn((2, 20, 8))
+
+    seq_lens = torch.tensor([20, 15])
+
+    export_s2t_transformer_frontend_to_onnx(frontend, pathname, seqs, seq_lens)
+
+    # The front-end must be restored to its previous mode.
+    assert frontend.training
+
+    onnx.checker.check_model(onnx.load(str(pathname)))
+
+    session = onnxruntime.InferenceSession(
+        str(pathname), providers=["CPUExecutionProvider"]
+    )
+
+    frontend.eval()
+
+    # Run with a different batch size and sequence length than the ones used
+    # for tracing to verify the dynamic axes.
+    seqs = torch.randn((3, 31, 8))
+
+    seq_lens = torch.tensor([31, 24, 9])
+
+    features, feature_seq_lens = session.run(
+        None, {"seqs": seqs.numpy(), "seq_lens": seq_lens.numpy()}
+    )
+
+    with torch.inference_mode():
+        expected_features, padding_mask = frontend(
+            seqs, PaddingMask(seq_lens, batch_seq_len=31)
+        )
+
+    assert padding_mask is not None
+
+    assert_close(torch.from_numpy(features), expected_features)
+
+    assert_equal(torch.from_numpy(feature_seq_lens), padding_mask.seq_lens)
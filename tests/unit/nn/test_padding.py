@@ -6,7 +6,7 @@
 
 import torch
 
-from fairseq2.nn.padding import to_padding_mask
+from fairseq2.nn.padding import PaddingMask, to_padding_mask
 from tests.common import assert_equal, device
 
 
@@ -30,3 +30,28 @@ def test_to_padding_mask_works() -> None:
     assert mask is not None
 
     assert_equal(mask, expected_mask)
+
+
+def test_padding_mask_materialize_as_float_works() -> None:
+    seq_lens = torch.tensor([2, 0, 3], device=device, dtype=torch.int32)
+
+    padding_mask = PaddingMask(seq_lens, batch_seq_len=3)
+
+    mask = padding_mask.materialize_as_float(torch.float32)
+
+    inf = torch.inf
+
+    # fmt: off
+    expected_mask = torch.tensor(
+        [
+            [0.0,  0.0,  -inf],
+            [-inf, -inf, -inf],
+            [0.0,  0.0,  0.0],
+        ],
+        device=device, dtype=torch.float32
+    )
+    # fmt: on
+
+    assert_equal(mask, expected_mask)
+
+    assert padding_mask.materialize_as_float(torch.float32) is mask
@@ -219,6 +219,25 @@ class TestLearnedPositionEncoder:
 
         assert_close(y - x, m.weight[step : step + seq_len].expand_as(y))
 
+    @pytest.mark.parametrize("step", [0, 1, 2])
+    def test_forward_works_in_incremental_decode_with_single_step(
+        self, step: int
+    ) -> None:
+        m = LearnedPositionEncoder(encoding_dim=32, max_seq_len=4, device=device)
+
+        state_bag = IncrementalStateBag(max_num_steps=3)
+        state_bag.increment_step(delta=step)
+
+        m.eval()
+
+        x = torch.randn((5, 1, 32), device=device)
+
+        y = m(x, padding_mask=None, state_bag=state_bag)
+
+        assert y.shape == (5, 1, 32)
+
+        assert_close(y - x, m.weight[step : step + 1].expand_as(y))
+
     def test_forward_raises_error_when_seq_len_is_out_of_range(self) -> None:
         m = LearnedPositionEncoder(encoding_dim=32, max_seq_len=3, device=device)
 
@@ -283,6 +302,38 @@ class TestRotaryEncoder:
 
         assert_close(dot1, dot2)
 
+    def test_forward_matches_pairwise_rotation(self) -> None:
+        m = RotaryEncoder(encoding_dim=8, max_seq_len=10, device=device)
+
+        x = torch.randn((2, 5, 8), device=device)
+
+        y = m(x, padding_mask=None)
+
+        # (S, E / 2)
+        angles = torch.angle(m.freqs[:5])
+
+        cos, sin = torch.cos(angles), torch.sin(angles)
+
+        x_even, x_odd = x[..., 0::2], x[..., 1::2]
+
+        expected = torch.stack(
+            (cos * x_even - sin * x_odd, sin * x_even + cos * x_odd), dim=-1
+        )
+
+        assert_close(y, expected.flatten(-2))
+
+    def test_forward_works_with_non_fp32_input(self) -> None:
+        m = RotaryEncoder(encoding_dim=8, max_seq_len=10, device=device)
+
+        x = torch.randn((2, 5, 8), device=device, dtype=torch.float64)
+
+        y1 = m(x, padding_mask=None)
+        y2 = m(x.float(), padding_mask=None)
+
+        assert y1.dtype == torch.float64
+
+        assert_close(y1.float(), y2)
+
     @pytest.mark.parametrize("step", [0, 1, 2])
     def test_forward_works_in_incremental_decode(self, step: int) -> None:
         m = RotaryEncoder(encoding_dim=32, max_seq_len=4, device=device)
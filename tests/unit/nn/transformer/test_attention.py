@@ -4,14 +4,23 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Any, Dict
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional, Tuple
 
 import pytest
 import torch
 from torch import Tensor
 
+import fairseq2.nn.transformer.attention
 from fairseq2.nn.padding import PaddingMask
-from fairseq2.nn.transformer import CustomAttentionMask, NaiveSDPA, TorchSDPA
+from fairseq2.nn.transformer import (
+    CausalAttentionMask,
+    CustomAttentionMask,
+    FlashSDPA,
+    NaiveSDPA,
+    TorchSDPA,
+)
+from fairseq2.typing import Device
 from fairseq2.utils.version import is_pt2_or_greater
 from tests.common import assert_close, device
 
@@ -49,9 +58,102 @@ class TestScaledDotProductAttention:
 
         assert_close(attn1, attn2)
 
+    @pytest.mark.skipif(
+        not is_pt2_or_greater(), reason="requires PyTorch 2.0.0 or greater"
+    )
+    @pytest.mark.skipif(device.type != "cuda", reason="requires CUDA")
+    def test_torch_sdpa_works_with_causal_mask_and_key_padding_mask(self) -> None:
+        torch_sdpa = TorchSDPA()
+        naive_sdpa = NaiveSDPA()
+
+        q = torch.randn((2, 4, 3, 2), device=device)
+        k = torch.randn((2, 4, 3, 2), device=device)
+        v = torch.randn((2, 4, 3, 3), device=device)
+
+        key_padding_mask = PaddingMask(torch.tensor([2, 3], device=device), 3)
+
+        attn_mask = CausalAttentionMask(3, 3, device=device)
+
+        attn1, _ = torch_sdpa(q, k, key_padding_mask, v, attn_mask=attn_mask)
+        attn2, _ = naive_sdpa(q, k, key_padding_mask, v, attn_mask=attn_mask)
+
+        # Outputs of padded positions are not defined.
+        assert_close(attn1[0, :, :2], attn2[0, :, :2])
+        assert_close(attn1[1], attn2[1])
+
+    def test_naive_sdpa_works_with_compute_dtype(self) -> None:
+        sdpa1 = NaiveSDPA()
+        sdpa2 = NaiveSDPA(compute_dtype=torch.float64)
+
+        kwargs = self._get_sdpa_args(use_key_padding_mask=True, use_attn_mask=True)
+
+        attn1, _ = sdpa1(**kwargs)
+        attn2, weights2 = sdpa2(**kwargs, needs_weights=True)
+
+        assert attn2.dtype == torch.float32
+
+        assert weights2 is not None
+
+        assert weights2.dtype == torch.float32
+
+        assert_close(attn1, attn2)
+
+    # fmt: off
+    @pytest.mark.parametrize("use_key_padding_mask,use_per_head_mask",
+        [
+            (False, False),
+            (True,  False),
+            (False, True),
+            (True,  True),
+        ],
+    )
+    # fmt: on
+    def test_naive_sdpa_works_with_attn_mask(
+        self, use_key_padding_mask: bool, use_per_head_mask: bool
+    ) -> None:
+        sdpa = NaiveSDPA()
+
+        kwargs = self._get_sdpa_args(
+            use_key_padding_mask,
+            use_attn_mask=True,
+            use_per_head_mask=use_per_head_mask,
+        )
+
+        attn, weights = sdpa(**kwargs, needs_weights=True)
+
+        assert weights is not None
+
+        expected_attn, expected_weights = self._compute_reference_attn(**kwargs)
+
+        assert_close(attn, expected_attn)
+
+        assert_close(weights, expected_weights)
+
+    @staticmethod
+    def _compute_reference_attn(
+        seqs: Tensor,
+        keys: Tensor,
+        key_padding_mask: Optional[PaddingMask],
+        values: Tensor,
+        attn_mask: Optional[CustomAttentionMask],
+    ) -> Tuple[Tensor, Tensor]:
+        weights = torch.matmul(seqs, keys.transpose(-1, -2)) / (seqs.size(-1) ** 0.5)
+
+        if attn_mask is not None:
+            weights = weights + attn_mask.materialize()
+
+        if key_padding_mask is not None:
+            m = key_padding_mask.materialize()
+
+            weights = weights.masked_fill(~m[:, None, None, :], -torch.inf)
+
+        weights = torch.softmax(weights, dim=-1)
+
+        return torch.matmul(weights, values), weights
+
     @staticmethod
     def _get_sdpa_args(
-        use_key_padding_mask: bool, use_attn_mask: bool
+        use_key_padding_mask: bool, use_attn_mask: bool, use_per_head_mask: bool = False
     ) -> Dict[str, Any]:
         batch_size = 2
 
@@ -78,7 +180,10 @@ class TestScaledDotProductAttention:
             key_padding_mask = None
 
         if use_attn_mask:
-            m = random_tensor(target_seq_len, source_seq_len)
+            if use_per_head_mask:
+                m = random_tensor(num_heads, target_seq_len, source_seq_len)
+            else:
+                m = random_tensor(target_seq_len, source_seq_len)
 
             attn_mask = CustomAttentionMask(m)
         else:
@@ -91,3 +196,266 @@ class TestScaledDotProductAttention:
             "values": v,
             "attn_mask": attn_mask,
         }
+
+
+@pytest.mark.skipif(not is_pt2_or_greater(), reason="requires PyTorch 2.0.0 or greater")
+class TestTorchSDPAWithNestedTensors:
+    seq_lens = [3, 5, 2]
+
+    @pytest.mark.skipif(device.type != "cuda", reason="requires CUDA")
+    @pytest.mark.parametrize("use_causal_mask", [False, True])
+    def test_forward_works(self, use_causal_mask: bool) -> None:
+        torch_sdpa = TorchSDPA()
+        naive_sdpa = NaiveSDPA()
+
+        torch_sdpa.eval()
+        naive_sdpa.eval()
+
+        qs, ks, vs = self._get_seqs(device)
+
+        if use_causal_mask:
+            max_seq_len = max(self.seq_lens)
+
+            attn_mask = CausalAttentionMask(max_seq_len, max_seq_len, device=device)
+        else:
+            attn_mask = None
+
+        q, k, v = self._to_nested(qs), self._to_nested(ks), self._to_nested(vs)
+
+        attn, _ = torch_sdpa(q, k, None, v, attn_mask=attn_mask)
+
+        # (N, H, S*, V) -> (N, S*, H, V)
+        attn = attn.transpose(1, 2)
+
+        for seq_attn, seq_q, seq_k, seq_v in zip(attn.unbind(), qs, ks, vs):
+            seq_len = seq_q.size(0)
+
+            if use_causal_mask:
+                seq_attn_mask = CausalAttentionMask(
+                    seq_len, seq_len, device=device, dtype=seq_q.dtype
+                )
+            else:
+                seq_attn_mask = None
+
+            # (S, H, K) -> (1, H, S, K)
+            seq_q = seq_q.transpose(0, 1).unsqueeze(0)
+            seq_k = seq_k.transpose(0, 1).unsqueeze(0)
+            seq_v = seq_v.transpose(0, 1).unsqueeze(0)
+
+            expected_attn, _ = naive_sdpa(
+                seq_q, seq_k, None, seq_v, attn_mask=seq_attn_mask
+            )
+
+            # (1, H, S, V) -> (S, H, V)
+            expected_attn = expected_attn.squeeze(0).transpose(0, 1)
+
+            torch.testing.assert_close(  # type: ignore[attr-defined]
+                seq_attn, expected_attn, rtol=1e-3, atol=1e-3
+            )
+
+    def test_forward_raises_error_when_key_padding_mask_is_not_none(self) -> None:
+        q, k, v = (self._to_nested(t) for t in self._get_seqs(device))
+
+        key_padding_mask = PaddingMask(torch.tensor(self.seq_lens, device=device), 5)
+
+        with pytest.raises(
+            ValueError,
+            match=r"^`key_padding_mask` must be `None` when `seqs` is a nested tensor\.$",
+        ):
+            TorchSDPA()(q, k, key_padding_mask, v)
+
+    def test_forward_raises_error_when_needs_weights_is_true(self) -> None:
+        q, k, v = (self._to_nested(t) for t in self._get_seqs(device))
+
+        with pytest.raises(
+            ValueError,
+            match=r"^`needs_weights` must be `False` when `seqs` is a nested tensor\.$",
+        ):
+            TorchSDPA()(q, k, None, v, needs_weights=True)
+
+    def test_forward_raises_error_when_attn_mask_is_not_causal(self) -> None:
+        q, k, v = (self._to_nested(t) for t in self._get_seqs(device))
+
+        attn_mask = CustomAttentionMask(torch.zeros((5, 5), device=device))
+
+        with pytest.raises(
+            ValueError,
+            match=r"^`attn_mask` must be `None` or a full `CausalAttentionMask` when `seqs` is a nested tensor, but is `CustomAttentionMask` instead\.$",
+        ):
+            TorchSDPA()(q, k, None, v, attn_mask=attn_mask)
+
+    def test_forward_raises_error_when_seqs_is_not_on_cuda(self) -> None:
+        cpu = Device("cpu")
+
+        q, k, v = (self._to_nested(t) for t in self._get_seqs(cpu))
+
+        with pytest.raises(
+            ValueError,
+            match=r"^`seqs` must be on a CUDA device when it is a nested tensor\.$",
+        ):
+            TorchSDPA()(q, k, None, v)
+
+    def _get_seqs(self, device: Device) -> Tuple[List[Tensor], ...]:
+        num_heads = 2
+
+        k_size = 8
+
+        # Nested SDPA on CUDA requires half precision.
+        dtype = torch.float16 if device.type == "cuda" else torch.float32
+
+        def random_seqs() -> List[Tensor]:
+            return [
+                torch.randn((seq_len, num_heads, k_size), device=device, dtype=dtype)
+                for seq_len in self.seq_lens
+            ]
+
+        return random_seqs(), random_seqs(), random_seqs()
+
+    @staticmethod
+    def _to_nested(seqs: List[Tensor]) -> Tensor:
+        # (N, S*, H, K) -> (N, H, S*, K)
+        return torch.nested.nested_tensor(seqs).transpose(1, 2)
+
+
+def _supports_flash_attn() -> bool:
+    if find_spec("flash_attn") is None or device.type != "cuda":
+        return False
+
+    return torch.cuda.get_device_capability(device) >= (8, 0)
+
+
+@pytest.mark.skipif(
+    not _supports_flash_attn(), reason="requires flash-attn and an SM80+ GPU"
+)
+class TestFlashSDPA:
+    @pytest.mark.parametrize("use_causal_mask", [False, True])
+    def test_forward_works(self, use_causal_mask: bool) -> None:
+        flash_sdpa = FlashSDPA()
+        naive_sdpa = NaiveSDPA()
+
+        flash_sdpa.eval()
+        naive_sdpa.eval()
+
+        q, k, v = self._get_qkv(torch.float16)
+
+        if use_causal_mask:
+            attn_mask = CausalAttentionMask(4, 4, device=device, dtype=torch.float16)
+        else:
+            attn_mask = None
+
+        attn1, _ = flash_sdpa(q, k, None, v, attn_mask=attn_mask)
+        attn2, _ = naive_sdpa(q, k, None, v, attn_mask=attn_mask)
+
+        torch.testing.assert_close(  # type: ignore[attr-defined]
+            attn1, attn2, rtol=1e-3, atol=1e-3
+        )
+
+    def test_forward_works_with_compute_dtype(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        flash_sdpa = FlashSDPA(compute_dtype=torch.bfloat16)
+        naive_sdpa = NaiveSDPA(compute_dtype=torch.bfloat16)
+
+        flash_sdpa.eval()
+        naive_sdpa.eval()
+
+        def fail(*args: Any, **kwargs: Any) -> None:
+            raise AssertionError("`fallback_sdpa` must not be called.")
+
+        monkeypatch.setattr(flash_sdpa.fallback_sdpa, "forward", fail)
+
+        q, k, v = self._get_qkv(torch.float32)
+
+        attn1, _ = flash_sdpa(q, k, None, v)
+        attn2, _ = naive_sdpa(q, k, None, v)
+
+        assert attn1.dtype == torch.float32
+
+        torch.testing.assert_close(  # type: ignore[attr-defined]
+            attn1, attn2, rtol=1e-2, atol=1e-2
+        )
+
+    # fmt: off
+    @pytest.mark.parametrize("dtype,use_key_padding_mask,use_attn_mask,needs_weights",
+        [
+            (torch.float32, False, False, False),
+            (torch.float16, True,  False, False),
+            (torch.float16, False, True,  False),
+            (torch.float16, False, False, True),
+        ],
+    )
+    # fmt: on
+    def test_forward_falls_back_to_torch_sdpa(
+        self,
+        dtype: torch.dtype,
+        use_key_padding_mask: bool,
+        use_attn_mask: bool,
+        needs_weights: bool,
+    ) -> None:
+        flash_sdpa = FlashSDPA()
+        naive_sdpa = NaiveSDPA()
+
+        flash_sdpa.eval()
+        naive_sdpa.eval()
+
+        q, k, v = self._get_qkv(dtype)
+
+        key_padding_mask: Optional[PaddingMask]
+
+        if use_key_padding_mask:
+            key_padding_mask = PaddingMask(torch.tensor([2, 4], device=device), 4)
+        else:
+            key_padding_mask = None
+
+        attn_mask: Optional[CustomAttentionMask]
+
+        if use_attn_mask:
+            m = torch.randn((4, 4), device=device, dtype=dtype)
+
+            attn_mask = CustomAttentionMask(m)
+        else:
+            attn_mask = None
+
+        attn1, weights1 = flash_sdpa(
+            q, k, key_padding_mask, v, attn_mask=attn_mask, needs_weights=needs_weights
+        )
+        attn2, weights2 = naive_sdpa(
+            q, k, key_padding_mask, v, attn_mask=attn_mask, needs_weights=needs_weights
+        )
+
+        torch.testing.assert_close(  # type: ignore[attr-defined]
+            attn1, attn2, rtol=1e-3, atol=1e-3
+        )
+
+        assert (weights1 is None) == (not needs_weights)
+
+    @staticmethod
+    def _get_qkv(dtype: torch.dtype) -> Tuple[Tensor, Tensor, Tensor]:
+        def random_tensor() -> Tensor:
+            return torch.randn((2, 4, 4, 8), device=device, dtype=dtype)
+
+        return random_tensor(), random_tensor(), random_tensor()
+
+
+# fmt: off
+@pytest.mark.parametrize("has_flash_attn,is_pt2,expected_factory",
+    [
+        (True,  True,  FlashSDPA),
+        (True,  False, NaiveSDPA),
+        (False, True,  TorchSDPA),
+        (False, False, NaiveSDPA),
+    ],
+)
+# fmt: on
+def test_get_fallback_sdpa_factory_works(
+    monkeypatch: pytest.MonkeyPatch,
+    has_flash_attn: bool,
+    is_pt2: bool,
+    expected_factory: Any,
+) -> None:
+    module = fairseq2.nn.transformer.attention
+
+    monkeypatch.setattr(module, "_has_flash_attn", has_flash_attn)
+    monkeypatch.setattr(module, "is_pt2_or_greater", lambda: is_pt2)
+
+    assert module._get_fallback_sdpa_factory() is expected_factory